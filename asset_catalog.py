@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Asset Catalog
+Indexes attached_assets/ so screenshots and pastes can be searched without
+opening every file by hand.
+
+Each entry records type, size, dimensions, a content hash, a perceptual
+hash (64-bit dHash) for images and a text snippet for pastes. The index is
+stored as gzipped JSON, one file per assets directory, and updated
+incrementally: files whose size and mtime haven't changed since the last
+run are not reopened.
+"""
+
+from PIL import Image
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+
+ASSETS_DIR = "attached_assets"
+CATALOG_DIR = ".cache"
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+TEXT_EXTENSIONS = (".txt", ".md")
+AUDIO_EXTENSIONS = (".m4a", ".mp3", ".wav", ".ogg", ".webm", ".flac")
+
+SNIPPET_LENGTH = 200
+
+# Hashes within this many differing bits (out of 64) count as near-duplicates
+DEFAULT_THRESHOLD = 6
+
+def file_type(filename):
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in IMAGE_EXTENSIONS:
+        return "image"
+    if extension in TEXT_EXTENSIONS:
+        return "text"
+    if extension in AUDIO_EXTENSIONS:
+        return "audio"
+    return "other"
+
+def content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def perceptual_hash(img):
+    """64-bit difference hash: compares neighbouring pixels of a 9x8 thumbnail"""
+    # JPEGs can be decoded at 1/8 scale, which is plenty for a 9x8 hash
+    img.draft("L", (64, 64))
+    small = img.convert("L").resize((9, 8), Image.Resampling.LANCZOS)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return f"{value:016x}"
+
+def describe_asset(path):
+    """Build the catalog entry for one file"""
+    stat = os.stat(path)
+    entry = {
+        "type": file_type(path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "sha256": content_hash(path),
+    }
+
+    if entry["type"] == "image":
+        try:
+            with Image.open(path) as img:
+                entry["width"], entry["height"] = img.size
+                entry["phash"] = perceptual_hash(img)
+        except (OSError, Image.DecompressionBombError) as e:
+            entry["error"] = str(e)
+    elif entry["type"] == "text":
+        with open(path, encoding="utf-8", errors="replace") as f:
+            entry["snippet"] = " ".join(f.read(SNIPPET_LENGTH * 2).split())[:SNIPPET_LENGTH]
+
+    return entry
+
+def catalog_path_for(assets_dir):
+    """Default index location, separate for each assets directory"""
+    assets_dir = os.path.abspath(assets_dir)
+    digest = hashlib.sha256(assets_dir.encode()).hexdigest()[:8]
+    return os.path.join(CATALOG_DIR, f"asset_catalog-{os.path.basename(assets_dir)}-{digest}.json.gz")
+
+def load_catalog(catalog_path, assets_dir):
+    """Load the entries indexed for assets_dir, or {} if there are none usable"""
+    if not os.path.exists(catalog_path):
+        return {}
+    try:
+        with gzip.open(catalog_path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, EOFError, ValueError) as e:
+        print(f"⚠️  Catalog {catalog_path} is unreadable ({e}), rebuilding it")
+        return {}
+    if data.get("assets_dir") != os.path.abspath(assets_dir):
+        print(f"Catalog {catalog_path} indexes {data.get('assets_dir')}, rebuilding it")
+        return {}
+    return data["files"]
+
+def save_catalog(catalog, catalog_path, assets_dir):
+    # Write to a temp file and rename it into place, so an interrupted run or
+    # two runs at once never leave a truncated index behind
+    directory = os.path.dirname(catalog_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+            json.dump({"assets_dir": os.path.abspath(assets_dir), "files": catalog},
+                      f, separators=(",", ":"), sort_keys=True)
+        os.replace(tmp_path, catalog_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def update_catalog(assets_dir=ASSETS_DIR, catalog_path=None):
+    """Scan the assets directory, re-indexing only new or modified files"""
+    if catalog_path is None:
+        catalog_path = catalog_path_for(assets_dir)
+    catalog = load_catalog(catalog_path, assets_dir)
+    seen = set()
+    added = updated = 0
+
+    for filename in sorted(os.listdir(assets_dir)):
+        path = os.path.join(assets_dir, filename)
+        if not os.path.isfile(path):
+            continue
+        seen.add(filename)
+
+        stat = os.stat(path)
+        existing = catalog.get(filename)
+        if existing and existing["size"] == stat.st_size and existing["mtime"] == stat.st_mtime:
+            continue
+
+        catalog[filename] = describe_asset(path)
+        if existing:
+            updated += 1
+        else:
+            added += 1
+
+    removed = [filename for filename in catalog if filename not in seen]
+    for filename in removed:
+        del catalog[filename]
+
+    save_catalog(catalog, catalog_path, assets_dir)
+    print(f"Catalog: {len(catalog)} files ({added} added, {updated} updated, {len(removed)} removed)")
+    return catalog
+
+def hamming(hash_a, hash_b):
+    return (int(hash_a, 16) ^ int(hash_b, 16)).bit_count()
+
+def _group(filenames, linked):
+    """Union the linked pairs and return the groups with more than one member"""
+    parent = {filename: filename for filename in filenames}
+
+    def find(filename):
+        while parent[filename] != filename:
+            parent[filename] = parent[parent[filename]]
+            filename = parent[filename]
+        return filename
+
+    for a, b in linked:
+        parent[find(a)] = find(b)
+
+    groups = {}
+    for filename in filenames:
+        groups.setdefault(find(filename), []).append(filename)
+    return [sorted(group) for group in groups.values() if len(group) > 1]
+
+def exact_duplicates(catalog):
+    """Groups of files with identical content"""
+    by_hash = {}
+    for filename, entry in catalog.items():
+        by_hash.setdefault(entry["sha256"], []).append(filename)
+    return [sorted(group) for group in by_hash.values() if len(group) > 1]
+
+def near_duplicates(catalog, threshold=DEFAULT_THRESHOLD):
+    """Groups of images whose perceptual hashes differ by at most threshold bits"""
+    images = sorted(filename for filename, entry in catalog.items() if "phash" in entry)
+    linked = [
+        (a, b)
+        for i, a in enumerate(images)
+        for b in images[i + 1:]
+        if hamming(catalog[a]["phash"], catalog[b]["phash"]) <= threshold
+    ]
+    return _group(images, linked)
+
+def main():
+    parser = argparse.ArgumentParser(description="Index attached_assets and find duplicates")
+    parser.add_argument("--assets", default=ASSETS_DIR, help="directory to index")
+    parser.add_argument("--catalog",
+                        help=f"index file location (default: one per assets directory in {CATALOG_DIR}/)")
+    parser.add_argument("--duplicates", action="store_true", help="list near-duplicate images")
+    parser.add_argument("--exact", action="store_true", help="list files with identical content")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD,
+                        help=f"max differing hash bits for near-duplicates (default: {DEFAULT_THRESHOLD})")
+    args = parser.parse_args()
+
+    catalog = update_catalog(args.assets, args.catalog)
+
+    counts = {}
+    for entry in catalog.values():
+        counts[entry["type"]] = counts.get(entry["type"], 0) + 1
+    for kind, count in sorted(counts.items()):
+        print(f"  {kind}: {count}")
+
+    if args.exact:
+        groups = exact_duplicates(catalog)
+        print(f"\n{len(groups)} groups of identical files:")
+        for group in groups:
+            print("  - " + "\n    ".join(group))
+
+    if args.duplicates:
+        groups = near_duplicates(catalog, args.threshold)
+        print(f"\n{len(groups)} groups of near-duplicate images (threshold {args.threshold}):")
+        for group in groups:
+            first = catalog[group[0]]
+            print(f"  - [{first['width']}x{first['height']}] " + "\n    ".join(group))
+
+if __name__ == "__main__":
+    main()
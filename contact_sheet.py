@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Contact Sheet Compositor
+Tiles existing screenshots from attached_assets/ into contact sheets or
+branded composite cards, instead of redrawing them by hand.
+
+Sources are decoded one at a time at reduced resolution: JPEGs use draft
+mode so libjpeg decodes straight to 1/2, 1/4 or 1/8 scale. PNG has no
+reduced-scale decode, so PNGs are shrunk with Image.reduce() straight after
+loading and only the small result is resampled. Each thumbnail is
+pasted and the source closed before the next is opened, and sheets are
+produced page by page, so peak memory is one source plus one page no matter
+how many images go in.
+"""
+
+from PIL import Image, ImageDraw, ImageFont
+import argparse
+import itertools
+import os
+
+from asset_catalog import IMAGE_EXTENSIONS
+
+ASSETS_DIR = "attached_assets"
+
+# Purple gradient matching MyNameIsApp branding
+PURPLE_DARK = (123, 44, 191)
+PURPLE_LIGHT = (199, 125, 255)
+
+BANNER_HEIGHT = 100
+LABEL_HEIGHT = 24
+
+def load_fonts():
+    try:
+        title_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 40)
+        label_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 12)
+    except:
+        title_font = ImageFont.load_default()
+        label_font = ImageFont.load_default()
+    return title_font, label_font
+
+def load_thumbnail(path, max_size, background="white"):
+    """Decode an image at reduced resolution and fit it within max_size"""
+    with Image.open(path) as img:
+        if img.format == "JPEG":
+            # Decodes at the smallest 1/n scale that is still at least max_size
+            img.draft("RGB", max_size)
+        else:
+            if img.mode not in ("RGB", "RGBA", "L", "LA"):
+                img = img.convert("RGBA")
+            # Integer box reduction is much cheaper than resampling the full image
+            factor = min(img.width // max_size[0], img.height // max_size[1])
+            if factor >= 2:
+                img = img.reduce(factor)
+        img.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+        if img.mode in ("RGBA", "LA"):
+            img = img.convert("RGBA")
+            flat = Image.new("RGB", img.size, background)
+            flat.paste(img, mask=img.getchannel("A"))
+            return flat
+        return img.convert("RGB")
+
+def draw_gradient(draw, top, height, width, start, end):
+    for y in range(height):
+        ratio = y / height
+        color = tuple(int(a + (b - a) * ratio) for a, b in zip(start, end))
+        draw.rectangle([(0, top + y), (width, top + y + 1)], fill=color)
+
+def create_contact_sheet(paths, columns=4, tile_size=(200, 200), padding=16,
+                         title=None, labels=False, background="white"):
+    """Tile images into one sheet, optionally as a card with a purple title banner"""
+    paths = list(paths)
+    rows = max(1, -(-len(paths) // columns))
+    cell_w = tile_size[0] + padding
+    cell_h = tile_size[1] + padding + (LABEL_HEIGHT if labels else 0)
+    header = BANNER_HEIGHT if title else 0
+    footer = BANNER_HEIGHT // 2 if title else 0
+
+    width = columns * cell_w + padding
+    height = header + rows * cell_h + padding + footer
+    sheet = Image.new("RGB", (width, height), background)
+    draw = ImageDraw.Draw(sheet)
+    title_font, label_font = load_fonts()
+
+    if title:
+        draw_gradient(draw, 0, header, width, PURPLE_DARK, PURPLE_LIGHT)
+        draw.text((width // 2, header // 2), title, font=title_font, fill="white", anchor="mm")
+        draw_gradient(draw, height - footer, footer, width, PURPLE_LIGHT, PURPLE_DARK)
+        draw.text((width // 2, height - footer // 2), "MyNameIsApp.co.uk",
+                  font=label_font, fill="white", anchor="mm")
+
+    for index, path in enumerate(paths):
+        column, row = index % columns, index // columns
+        x = padding + column * cell_w
+        y = header + padding + row * cell_h
+        try:
+            thumb = load_thumbnail(path, tile_size, background)
+        except OSError as e:
+            print(f"⚠️  Skipping {path}: {e}")
+            continue
+        # Centre the thumbnail in its cell
+        sheet.paste(thumb, (x + (tile_size[0] - thumb.width) // 2,
+                            y + (tile_size[1] - thumb.height) // 2))
+        thumb.close()
+
+        if labels:
+            name = os.path.basename(path)
+            if len(name) > 30:
+                name = name[:27] + "..."
+            draw.text((x + tile_size[0] // 2, y + tile_size[1] + LABEL_HEIGHT // 2), name,
+                      font=label_font, fill="#657786", anchor="mm")
+
+    return sheet
+
+def iter_contact_sheets(paths, per_page=20, **options):
+    """Yield one sheet per page of paths, consuming the paths lazily"""
+    paths = iter(paths)
+    while True:
+        page = list(itertools.islice(paths, per_page))
+        if not page:
+            return
+        yield create_contact_sheet(page, **options)
+
+def find_screenshots(assets_dir=ASSETS_DIR, unique=False):
+    """List the images in the assets directory, optionally skipping near-duplicates"""
+    paths = sorted(
+        os.path.join(assets_dir, file)
+        for file in os.listdir(assets_dir)
+        if file.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    if unique:
+        from asset_catalog import near_duplicates, update_catalog
+
+        catalog = update_catalog(assets_dir)
+        skip = {
+            os.path.join(assets_dir, name)
+            for group in near_duplicates(catalog)
+            for name in group[1:]
+        }
+        paths = [path for path in paths if path not in skip]
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Tile screenshots into contact sheets")
+    parser.add_argument("images", nargs="*", help="images to tile (default: attached_assets)")
+    parser.add_argument("--output", default="contact_sheet.png",
+                        help="output file; pages after the first get -2, -3, ... suffixes")
+    parser.add_argument("--columns", type=int, default=4)
+    parser.add_argument("--tile", type=int, default=200, help="maximum thumbnail edge in pixels")
+    parser.add_argument("--per-page", type=int, default=20, help="images per sheet")
+    parser.add_argument("--title", help="add a purple title banner, as on the composite cards")
+    parser.add_argument("--labels", action="store_true", help="caption each tile with its filename")
+    parser.add_argument("--unique", action="store_true",
+                        help="skip near-duplicate screenshots (uses the asset catalog)")
+    args = parser.parse_args()
+
+    paths = args.images or find_screenshots(unique=args.unique)
+    print(f"Creating contact sheets from {len(paths)} images...")
+
+    base, extension = os.path.splitext(args.output)
+    sheets = iter_contact_sheets(
+        paths, per_page=args.per_page, columns=args.columns,
+        tile_size=(args.tile, args.tile), title=args.title, labels=args.labels,
+    )
+    for page, sheet in enumerate(sheets, start=1):
+        output_path = args.output if page == 1 else f"{base}-{page}{extension}"
+        sheet.save(output_path, optimize=True)
+        print(f"✅ Contact sheet saved as: {output_path} ({sheet.size[0]}x{sheet.size[1]} pixels)")
+        sheet.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Job Queue
+Asyncio scheduler fronting phonics transcription and asset rendering.
+
+Each job type gets its own priority queue and a fixed number of worker
+slots, so a long batch of renders can't starve an interactive transcription
+and a machine is never asked to run more CPU-heavy jobs than it has cores.
+Queues are bounded: submit() waits when a type already has max_pending
+live jobs queued, and submit_nowait() raises asyncio.QueueFull so callers
+can shed load. Cancelled jobs stop counting towards the bound immediately.
+
+Finished jobs stay pollable by id until keep_finished newer ones have
+finished, or until forget() is called for them.
+"""
+
+import asyncio
+import collections
+import itertools
+import os
+import signal
+import sys
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+# The scripts expect to be run from the repository root
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Lower numbers run first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+# The one-shot renderers, run as separate processes because several of them
+# do their work at import time
+RENDER_SCRIPTS = {
+    "combined_screenshot": "generate_combined_screenshot.py",
+    "confirmation_graphic": "generate_confirmation_graphic.py",
+    "endorsements": "generate_endorsements.py",
+    "replit_endorsement": "generate_replit_endorsement.py",
+}
+
+DEFAULT_CONCURRENCY = {
+    # One Whisper process per core
+    "transcribe": os.cpu_count() or 1,
+    # Pillow renders are short and mostly single threaded
+    "render": 2,
+    # screenshot_welcome.py drives Chromium on a fixed debugging port, so
+    # only one browser can run at a time
+    "screenshot": 1,
+}
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+class JobCancelled(Exception):
+    """Raised by Job.wait() when the job was cancelled before it finished"""
+
+# Whisper models loaded in this worker process, keyed by (size, quantized)
+_worker_models = {}
+
+def _init_transcribe_worker():
+    """Keep each transcription process to a single thread so slots map to cores"""
+    import torch
+    torch.set_num_threads(1)
+
+def _transcribe_worker(audio_file, model_size, quantized, decode_options):
+    """Transcribe one clip inside a pool process, reusing its loaded model"""
+    from transcribe_phonics import load_model
+
+    key = (model_size, quantized)
+    if key not in _worker_models:
+        _worker_models[key] = load_model(model_size, quantized)
+    result = _worker_models[key].transcribe(audio_file, fp16=False, **(decode_options or {}))
+    return {"text": result["text"], "segments": result["segments"]}
+
+@dataclass
+class Job:
+    """A unit of work and its current status"""
+    type: str
+    payload: dict
+    priority: int = PRIORITY_BATCH
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    status: str = QUEUED
+    result: object = None
+    error: str = None
+    _future: asyncio.Future = field(default=None, repr=False)
+
+    async def wait(self):
+        """Wait for the job to finish and return its result
+
+        Re-raises the job's exception if it failed, and raises JobCancelled
+        if it was cancelled. CancelledError only means the waiting task
+        itself was cancelled; the job keeps running.
+        """
+        return await asyncio.shield(self._future)
+
+class JobQueue:
+    """Priority job queues with bounded concurrency per job type"""
+
+    def __init__(self, concurrency=None, max_pending=100, keep_finished=1000):
+        self.concurrency = dict(DEFAULT_CONCURRENCY, **(concurrency or {}))
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+        self.jobs = {}
+        self._finished = collections.deque()
+        self._queues = {}
+        # Queued jobs that haven't been cancelled, and submitters waiting for room
+        self._live = {}
+        self._waiters = {}
+        self._workers = []
+        self._counter = itertools.count()
+        self._pool = None
+        self._handlers = {
+            "transcribe": self._run_transcribe,
+            "render": self._run_render,
+            "screenshot": self._run_screenshot,
+        }
+
+    async def start(self):
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.concurrency["transcribe"],
+            initializer=_init_transcribe_worker,
+        )
+        for job_type, slots in self.concurrency.items():
+            # Unbounded: max_pending is enforced on live jobs in submit()
+            queue = asyncio.PriorityQueue()
+            self._queues[job_type] = queue
+            self._live[job_type] = 0
+            self._waiters[job_type] = collections.deque()
+            for _ in range(slots):
+                self._workers.append(asyncio.create_task(self._worker(job_type, queue)))
+        return self
+
+    async def close(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for job in self.jobs.values():
+            if job.status in (QUEUED, RUNNING):
+                self._cancel_job(job)
+        if self._pool is not None:
+            # Don't block the event loop on a transcription that is mid-run
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _new_job(self, job_type, payload, priority):
+        if job_type not in self._queues:
+            raise ValueError(f"Unknown job type: {job_type}")
+        if job_type == "render" and payload.get("renderer") not in RENDER_SCRIPTS:
+            raise ValueError(f"Unknown renderer: {payload.get('renderer')}")
+        job = Job(job_type, payload, priority)
+        job._future = asyncio.get_running_loop().create_future()
+        # Callers may only poll status(), so mark exceptions as retrieved
+        # to keep asyncio from logging them when the future is collected
+        job._future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        return job, (priority, next(self._counter), job)
+
+    def _enqueue(self, job, entry):
+        self._live[job.type] += 1
+        self._queues[job.type].put_nowait(entry)
+        self.jobs[job.id] = job
+        return job
+
+    def _release(self, job_type):
+        """A queued job started or was cancelled, so wake one waiting submitter"""
+        self._live[job_type] -= 1
+        waiters = self._waiters[job_type]
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    async def submit(self, job_type, payload, priority=PRIORITY_BATCH):
+        """Queue a job, waiting for room if max_pending jobs are already queued"""
+        job, entry = self._new_job(job_type, payload, priority)
+        while self._live[job_type] >= self.max_pending:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters[job_type].append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                waiter.cancel()
+                # Pass on a wake-up this submitter can no longer use
+                if self._live[job_type] < self.max_pending and self._waiters[job_type]:
+                    self._live[job_type] += 1
+                    self._release(job_type)
+                raise
+        return self._enqueue(job, entry)
+
+    def submit_nowait(self, job_type, payload, priority=PRIORITY_BATCH):
+        """Queue a job, raising asyncio.QueueFull if max_pending jobs are already queued"""
+        job, entry = self._new_job(job_type, payload, priority)
+        if self._live[job_type] >= self.max_pending:
+            raise asyncio.QueueFull
+        return self._enqueue(job, entry)
+
+    def status(self, job_id):
+        """Poll a job's status: queued, running, done, failed or cancelled"""
+        return self.jobs[job_id].status
+
+    def cancel(self, job_id):
+        """Cancel a job that hasn't started yet"""
+        job = self.jobs[job_id]
+        if job.status != QUEUED:
+            return False
+        self._cancel_job(job)
+        self._release(job.type)
+        self._finish(job)
+        return True
+
+    def _cancel_job(self, job):
+        job.status = CANCELLED
+        job.error = "cancelled"
+        if not job._future.done():
+            job._future.set_exception(JobCancelled(f"Job {job.id} was cancelled"))
+
+    def forget(self, job_id):
+        """Drop a finished job so the queue no longer holds its result"""
+        job = self.jobs[job_id]
+        if job.status in (QUEUED, RUNNING):
+            raise ValueError(f"Job {job_id} is still {job.status}")
+        del self.jobs[job_id]
+
+    def pending(self, job_type):
+        """Number of queued jobs that haven't been cancelled"""
+        return self._live[job_type]
+
+    def _finish(self, job):
+        """Record a finished job, dropping the oldest beyond keep_finished"""
+        self._finished.append(job.id)
+        while len(self._finished) > self.keep_finished:
+            self.jobs.pop(self._finished.popleft(), None)
+
+    async def _worker(self, job_type, queue):
+        handler = self._handlers[job_type]
+        while True:
+            _, _, job = await queue.get()
+            try:
+                if job.status == CANCELLED:
+                    continue
+                self._release(job_type)
+                job.status = RUNNING
+                try:
+                    job.result = await handler(job.payload)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    job.status = FAILED
+                    job.error = str(e)
+                    job._future.set_exception(e)
+                else:
+                    job.status = DONE
+                    job._future.set_result(job.result)
+                self._finish(job)
+            finally:
+                queue.task_done()
+
+    async def _run_transcribe(self, payload):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._pool,
+            _transcribe_worker,
+            payload["audio_file"],
+            payload.get("model_size", "base"),
+            payload.get("quantized", False),
+            payload.get("decode_options"),
+        )
+
+    async def _run_render(self, payload):
+        return await self._run_script(RENDER_SCRIPTS[payload["renderer"]])
+
+    async def _run_screenshot(self, payload):
+        return await self._run_script("screenshot_welcome.py")
+
+    async def _run_script(self, script):
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, script,
+            cwd=ROOT_DIR,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            # Own process group, so a kill also reaches Chromium and chromedriver
+            start_new_session=True,
+        )
+        try:
+            output, _ = await process.communicate()
+        except asyncio.CancelledError:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            await process.wait()
+            raise
+        output = output.decode(errors="replace")
+        if process.returncode != 0:
+            raise RuntimeError(f"{script} exited with {process.returncode}:\n{output}")
+        return output
+
+async def main():
+    from transcribe_phonics import find_phonics_clips
+
+    async with JobQueue() as jobs:
+        batch = [await jobs.submit("render", {"renderer": name}) for name in RENDER_SCRIPTS]
+        clips = [
+            await jobs.submit("transcribe", {"audio_file": clip}, priority=PRIORITY_INTERACTIVE)
+            for clip in find_phonics_clips()
+        ]
+
+        for job in clips + batch:
+            try:
+                await job.wait()
+            except Exception:
+                pass
+            print(f"{job.type:<10} {job.id} {job.status}")
+            if job.error:
+                print(f"   {job.error.splitlines()[0]}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
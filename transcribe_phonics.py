@@ -1,17 +1,161 @@
-
 import whisper
+import argparse
+import difflib
 import os
+import re
+import statistics
+import tempfile
+import time
+
+# Quantized weights are cached here so int8 quantization only happens once
+QUANTIZED_CACHE_DIR = os.path.join(".cache", "whisper_quantized")
+
+AUDIO_EXTENSIONS = (".m4a", ".mp3", ".wav", ".ogg", ".webm", ".flac")
+
+# Letter sounds the clips are made of, used to bias decoding towards them
+PHONICS_SOUNDS = [
+    "a", "b", "c", "d", "e", "f", "g", "h", "i", "j", "k", "l", "m",
+    "n", "o", "p", "q", "r", "s", "t", "u", "v", "w", "x", "y", "z",
+    "sh", "ch", "th", "ng", "qu", "ai", "ee", "oa", "oo", "ar", "or",
+]
+
+def phonics_decode_options(model, names=None, suppress_words=None):
+    """Fast decoding profile for short English letter-sound and name clips
+
+    Pins the language (skipping detection), decodes greedily with a single
+    temperature (no fallback retries) and biases the output towards the
+    phonics sounds and any supplied names through the initial prompt.
+    Words in suppress_words are never emitted.
+    """
+    # Whisper keeps only the end of a long prompt, so the names go last
+    vocabulary = PHONICS_SOUNDS + list(names or [])
+    options = {
+        "language": "en",
+        "task": "transcribe",
+        "temperature": 0.0,
+        "beam_size": None,
+        "best_of": None,
+        "condition_on_previous_text": False,
+        "initial_prompt": "Phonics sounds and names: " + ", ".join(vocabulary) + ".",
+    }
+
+    if suppress_words:
+        tokenizer = whisper.tokenizer.get_tokenizer(
+            model.is_multilingual,
+            num_languages=model.num_languages,
+            language="en",
+            task="transcribe",
+        )
+        suppress_tokens = {-1}
+        for word in suppress_words:
+            # Whisper emits words both at the start of a segment and after a
+            # space, and capitalizes segment-initial words
+            found = False
+            for form in {word, word.lower(), word.capitalize()}:
+                for variant in (form, " " + form):
+                    tokens = tokenizer.encode(variant)
+                    if len(tokens) == 1:
+                        suppress_tokens.add(tokens[0])
+                        found = True
+            if not found:
+                print(f"Warning: can't suppress '{word}', every form of it is more than one token")
+        options["suppress_tokens"] = sorted(suppress_tokens)
+
+    return options
+
+def load_vocabulary(path):
+    """Read one name or sound per line, ignoring blanks and # comments"""
+    with open(path) as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
+
+def quantize_model(model):
+    """Apply int8 dynamic quantization to the Linear layers of a Whisper model"""
+    import torch
+
+    # Whisper uses its own Linear subclass (it only adds a dtype cast for fp16),
+    # which torch's dynamic quantization does not recognise. On CPU the model
+    # runs in fp32 so the cast is a no-op and we can treat them as plain Linear.
+    for module in model.modules():
+        if isinstance(module, whisper.model.Linear):
+            module.__class__ = torch.nn.Linear
 
-def transcribe_audio(audio_file_path):
+    return torch.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+def checkpoint_id(model_size):
+    """Short id of the checkpoint behind a model name or path, or None if unknown"""
+    if os.path.isfile(model_size):
+        # Hashing a multi-GB checkpoint on every load would cost more than the
+        # cache saves, so a local file is identified by its size and mtime
+        stat = os.stat(model_size)
+        return f"{stat.st_size:x}{stat.st_mtime_ns:x}"
+    if model_size in whisper._MODELS:
+        # Whisper's download URLs contain the checkpoint's SHA256
+        return whisper._MODELS[model_size].split("/")[-2][:12]
+    return None
+
+def quantized_cache_path(model_size):
+    """Cache file for a quantized model, keyed on everything the pickle depends on"""
+    import torch
+
+    checkpoint = checkpoint_id(model_size)
+    if checkpoint is None:
+        return None
+
+    # The whole module is pickled, so a torch or whisper upgrade invalidates it
+    name = os.path.splitext(os.path.basename(model_size))[0]
+    whisper_version = getattr(whisper, "__version__", "unknown")
+    key = f"{name}-{checkpoint}-torch{torch.__version__}-whisper{whisper_version}"
+    return os.path.join(QUANTIZED_CACHE_DIR, f"{key}-int8.pt")
+
+def load_model(model_size="base", quantized=False):
+    """Load a Whisper model, optionally int8-quantized for CPU inference"""
+    if not quantized:
+        print(f"Loading Whisper model ({model_size})...")
+        return whisper.load_model(model_size, device="cpu")
+
+    import torch
+
+    cache_path = quantized_cache_path(model_size)
+    if cache_path and os.path.exists(cache_path):
+        print(f"Loading cached quantized Whisper model ({model_size}, int8)...")
+        try:
+            return torch.load(cache_path, map_location="cpu", weights_only=False)
+        except Exception as e:
+            print(f"Cached quantized model is unreadable ({e}), quantizing again...")
+
+    print(f"Quantizing Whisper model ({model_size}) to int8...")
+    # Unknown model names are reported by whisper itself
+    model = quantize_model(whisper.load_model(model_size, device="cpu"))
+    if cache_path is None:
+        return model
+
+    # Write to a temp file and rename it into place, so an interrupted save or
+    # several processes quantizing at once never leave a truncated cache file
+    os.makedirs(QUANTIZED_CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=QUANTIZED_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            torch.save(model, f)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    print(f"Quantized model cached at {cache_path}")
+    return model
+
+def transcribe_audio(audio_file_path, model_size="base", quantized=False, model=None, decode_options=None):
     """Transcribe audio file using Whisper"""
     # Load the Whisper model (base is good for phonics)
-    print("Loading Whisper model...")
-    model = whisper.load_model("base")
-    
+    if model is None:
+        model = load_model(model_size, quantized)
+
     # Transcribe the audio
     print(f"Transcribing {audio_file_path}...")
-    result = model.transcribe(audio_file_path)
-    
+    result = model.transcribe(audio_file_path, fp16=False, **(decode_options or {}))
+
     # Print the full result
     print("\n" + "="*50)
     print("TRANSCRIPTION RESULT:")
@@ -20,22 +164,175 @@ def transcribe_audio(audio_file_path):
     print("\n" + "="*50)
     print("DETAILED SEGMENTS:")
     print("="*50)
-    
+
     for i, segment in enumerate(result['segments']):
         start_time = segment['start']
         end_time = segment['end']
         text = segment['text']
         print(f"Segment {i+1}: [{start_time:.2f}s - {end_time:.2f}s] {text}")
-    
+
     return result
 
+def find_phonics_clips(directory="attached_assets"):
+    """List the audio clips in a directory"""
+    if not os.path.exists(directory):
+        return []
+    return sorted(
+        os.path.join(directory, file)
+        for file in os.listdir(directory)
+        if file.lower().endswith(AUDIO_EXTENSIONS)
+    )
+
+def reference_transcript(audio_file):
+    """Expected transcript stored next to a clip as <clip>.txt, if there is one"""
+    path = os.path.splitext(audio_file)[0] + ".txt"
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return f.read().strip()
+
+def normalize_words(text):
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+def word_error_rate(reference, hypothesis):
+    """Word-level edit distance divided by the number of reference words"""
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, start=1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            ))
+        previous = current
+    return previous[-1] / max(len(ref), 1)
+
+def compare_quantization(audio_files, model_size="base", report_path="phonics_quantization_report.txt",
+                         decode_options=None, models=None, repeats=3):
+    """Compare int8 against full-precision transcription for speed and accuracy
+
+    Each model transcribes the first clip once untimed to pay its one-off
+    costs, then every clip is timed repeats times and the median is reported.
+    Accuracy is word error rate against a <clip>.txt reference transcript
+    when one exists. fp32 agreement (word overlap of the int8 text with the
+    fp32 text) is always reported, but it only shows how much quantization
+    changes the output, not whether either transcript is correct.
+    """
+    if models is None:
+        models = {
+            "fp32": load_model(model_size, quantized=False),
+            "int8": load_model(model_size, quantized=True),
+        }
+    options = decode_options or {}
+
+    if audio_files:
+        for model in models.values():
+            model.transcribe(audio_files[0], fp16=False, **options)
+
+    rows = []
+    for audio_file in audio_files:
+        row = {"file": audio_file, "reference": reference_transcript(audio_file)}
+        for mode, model in models.items():
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                result = model.transcribe(audio_file, fp16=False, **options)
+                timings.append(time.perf_counter() - start)
+            row[f"{mode}_seconds"] = statistics.median(timings)
+            row[f"{mode}_text"] = result["text"].strip()
+            if row["reference"] is not None:
+                row[f"{mode}_wer"] = word_error_rate(row["reference"], row[f"{mode}_text"])
+        row["agreement"] = difflib.SequenceMatcher(
+            None, normalize_words(row["fp32_text"]), normalize_words(row["int8_text"])
+        ).ratio()
+        rows.append(row)
+
+    with open(report_path, "w") as f:
+        f.write("PHONICS QUANTIZATION REPORT\n")
+        f.write("=" * 40 + "\n\n")
+        f.write(f"Model: {model_size} (fp32 vs int8 dynamic quantization)\n")
+        f.write(f"Clips: {len(rows)}, timings are the median of {repeats} runs after a warm-up\n")
+        f.write("WER = word error rate against <clip>.txt, where a reference exists\n")
+        f.write("fp32 agreement = word overlap of int8 text with fp32 text, not accuracy\n\n")
+        for row in rows:
+            speedup = row["fp32_seconds"] / row["int8_seconds"] if row["int8_seconds"] else 0.0
+            f.write(f"{row['file']}\n")
+            if row["reference"] is not None:
+                f.write(f"  reference: {row['reference']}\n")
+            for mode in ("fp32", "int8"):
+                wer = f"  WER {row[mode + '_wer']:.1%}" if row["reference"] is not None else ""
+                f.write(f"  {mode}: {row[mode + '_seconds']:.2f}s{wer}  {row[mode + '_text']}\n")
+            f.write(f"  speedup: {speedup:.2f}x  fp32 agreement: {row['agreement']:.1%}\n\n")
+        if rows:
+            fp32_total = sum(row["fp32_seconds"] for row in rows)
+            int8_total = sum(row["int8_seconds"] for row in rows)
+            mean_agreement = sum(row["agreement"] for row in rows) / len(rows)
+            f.write("Summary:\n")
+            f.write(f"  fp32 total: {fp32_total:.2f}s\n")
+            f.write(f"  int8 total: {int8_total:.2f}s\n")
+            if int8_total:
+                f.write(f"  overall speedup: {fp32_total / int8_total:.2f}x\n")
+            referenced = [row for row in rows if row["reference"] is not None]
+            if referenced:
+                for mode in ("fp32", "int8"):
+                    mean_wer = sum(row[mode + "_wer"] for row in referenced) / len(referenced)
+                    f.write(f"  {mode} mean WER: {mean_wer:.1%} ({len(referenced)} clips with references)\n")
+            else:
+                f.write("  no reference transcripts found, so no WER\n")
+            f.write(f"  mean fp32 agreement: {mean_agreement:.1%}\n")
+
+    print(f"\nQuantization report saved to '{report_path}'")
+    return rows
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transcribe phonics audio with Whisper")
+    parser.add_argument("--model", default="base", help="Whisper model size (default: base)")
+    parser.add_argument("--quantized", action="store_true",
+                        help="use int8 dynamic quantization for faster CPU inference")
+    parser.add_argument("--compare", action="store_true",
+                        help="compare int8 and fp32 speed and accuracy on the phonics clips "
+                             "(WER needs a <clip>.txt reference next to each clip)")
+    parser.add_argument("--fast", action="store_true",
+                        help="use the phonics decoding profile (English, greedy, no fallback)")
+    parser.add_argument("--names", nargs="*", default=[],
+                        help="children's names to bias the fast profile towards")
+    parser.add_argument("--vocab", help="file with extra names/sounds, one per line")
+    parser.add_argument("--suppress", nargs="*", default=[],
+                        help="words the fast profile should never emit; matching is per token, "
+                             "so words that span several tokens are skipped with a warning")
+    args = parser.parse_args()
+
+    # Load up front so the fast profile can use the model's own tokenizer
+    if args.compare:
+        models = {
+            "fp32": load_model(args.model, quantized=False),
+            "int8": load_model(args.model, quantized=True),
+        }
+        model = models["fp32"]
+    else:
+        model = load_model(args.model, args.quantized)
+
+    decode_options = None
+    if args.fast:
+        names = args.names + (load_vocabulary(args.vocab) if args.vocab else [])
+        decode_options = phonics_decode_options(model, names, args.suppress)
+
+    if args.compare:
+        clips = find_phonics_clips()
+        if clips:
+            compare_quantization(clips, args.model, decode_options=decode_options, models=models)
+        else:
+            print("No audio clips found in attached_assets")
+        raise SystemExit
+
     # Your audio file path
     audio_file = "attached_assets/phonics 1 669_1752702446474.m4a"
-    
+
     if os.path.exists(audio_file):
-        result = transcribe_audio(audio_file)
-        
+        result = transcribe_audio(audio_file, model=model, decode_options=decode_options)
+
         # Save transcription to file
         with open("phonics_transcription.txt", "w") as f:
             f.write("PHONICS AUDIO TRANSCRIPTION\n")
@@ -44,7 +341,7 @@ if __name__ == "__main__":
             f.write("Detailed segments:\n")
             for i, segment in enumerate(result['segments']):
                 f.write(f"Segment {i+1}: [{segment['start']:.2f}s - {segment['end']:.2f}s] {segment['text']}\n")
-        
+
         print(f"\nTranscription saved to 'phonics_transcription.txt'")
     else:
         print(f"Audio file not found: {audio_file}")